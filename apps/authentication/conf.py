@@ -1,39 +1,62 @@
 """App settings for authentication app."""
 
-from typing import ClassVar
+from functools import cached_property
+from typing import Any, ClassVar
 
 from django.conf import settings
+from django.core.signals import setting_changed
 
 __all__ = ["verification_code_settings"]
 
 
 class VerificationCodeSettings:
-    """Settings for user verification codes."""
+    """Settings for user verification codes.
+
+    Values are resolved from the Django settings on first access and cached afterwards.
+    """
 
     DEFAULT_CODE_LENGTH: ClassVar[int] = 6
     DEFAULT_CODE_CHARACTERS: ClassVar[str] = "0123456789"
     DEFAULT_MAX_ATTEMPTS: ClassVar[int] = 5
     DEFAULT_EXPIRATION_MINUTES: ClassVar[int] = 7
 
-    @property
+    @cached_property
     def CODE_LENGTH(self) -> int:
         """Verification code length."""
         return getattr(settings, "VERIFICATION_CODE_LENGTH", self.DEFAULT_CODE_LENGTH)
 
-    @property
+    @cached_property
     def CODE_CHARACTERS(self) -> str:
         """Verification code allowed characters."""
         return getattr(settings, "VERIFICATION_CODE_CHARACTERS", self.DEFAULT_CODE_CHARACTERS)
 
-    @property
+    @cached_property
+    def CODE_CHARACTER_POOL(self) -> tuple[str, ...]:
+        """Verification code allowed characters as a sequence ready for sampling."""
+        return tuple(self.CODE_CHARACTERS)
+
+    @cached_property
     def MAX_ATTEMPTS(self) -> int:
         """Verification code maximum attempts before locking out."""
         return getattr(settings, "VERIFICATION_CODE_MAX_ATTEMPTS", self.DEFAULT_MAX_ATTEMPTS)
 
-    @property
+    @cached_property
     def EXPIRATION_MINUTES(self) -> int:
         """Verification code expiration time in minutes."""
         return getattr(settings, "VERIFICATION_CODE_EXPIRATION_MINUTES", self.DEFAULT_EXPIRATION_MINUTES)
 
+    def reload(self) -> None:
+        """Clear the cached settings so they are resolved again on next access."""
+        self.__dict__.clear()
+
 
 verification_code_settings = VerificationCodeSettings()
+
+
+def reload_verification_code_settings(*, setting: str, **kwargs: Any) -> None:
+    """Reload the verification code settings when a related Django setting changes (e.g. ``override_settings``)."""
+    if setting.startswith("VERIFICATION_CODE_"):
+        verification_code_settings.reload()
+
+
+setting_changed.connect(reload_verification_code_settings)
@@ -1,14 +1,17 @@
 """Helper functions for user-related operations."""
 
 from datetime import datetime, timedelta
+from random import SystemRandom
 
 from django.utils import timezone
-from django.utils.crypto import get_random_string
 
 from .conf import verification_code_settings
 
 __all__ = ["calcule_verification_code_expiration", "generate_raw_verification_code"]
 
+# Cryptographically secure generator, verification codes must not be predictable
+_system_random = SystemRandom()
+
 
 def calcule_verification_code_expiration(minutes: int) -> datetime:
     """Calculate the expiration time for a verification code."""
@@ -20,7 +23,9 @@ def generate_raw_verification_code() -> str:
 
     The generated code will have a length and character set defined in the verification_code_settings.
     """
-    return get_random_string(
-        length=verification_code_settings.CODE_LENGTH,
-        allowed_chars=verification_code_settings.CODE_CHARACTERS,
+    return "".join(
+        _system_random.choices(
+            verification_code_settings.CODE_CHARACTER_POOL,
+            k=verification_code_settings.CODE_LENGTH,
+        )
     )
@@ -0,0 +1,29 @@
+"""Tests for the authentication app."""
+
+from django.test import SimpleTestCase, override_settings
+
+from .conf import verification_code_settings
+from .helpers import generate_raw_verification_code
+
+
+class VerificationCodeSettingsTests(SimpleTestCase):
+    """Tests for the cached verification code settings."""
+
+    def assert_code_matches(self, length: int, characters: str) -> None:
+        """Assert generated codes have the given length and only use the given characters."""
+        for _ in range(20):
+            code = generate_raw_verification_code()
+
+            self.assertEqual(len(code), length)
+            self.assertLessEqual(set(code), set(characters))
+
+    def test_generated_code_follows_overridden_settings(self) -> None:
+        """Test that overriding the settings invalidates the cached values, then restores the defaults."""
+        self.assert_code_matches(6, "0123456789")
+
+        with override_settings(VERIFICATION_CODE_LENGTH=10, VERIFICATION_CODE_CHARACTERS="AB"):
+            self.assertEqual(verification_code_settings.CODE_CHARACTER_POOL, ("A", "B"))
+            self.assert_code_matches(10, "AB")
+
+        self.assertEqual(verification_code_settings.CODE_LENGTH, 6)
+        self.assert_code_matches(6, "0123456789")
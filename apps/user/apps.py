@@ -1,7 +1,15 @@
+"""User app configuration."""
+
 from django.apps import AppConfig
 
 
 class UserConfig(AppConfig):
+    """User app configuration."""
+
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.user"
     label = "user"
+
+    def ready(self) -> None:
+        """Initialize the user app."""
+        import apps.user.signals
@@ -0,0 +1,22 @@
+"""Helper functions for user-related operations."""
+
+from functools import lru_cache
+
+from django.utils.translation import get_language
+from django_countries import countries
+
+__all__ = ["country_name"]
+
+
+@lru_cache(maxsize=300)
+def _translated_country_name(code: str, language: str | None) -> str:
+    """Return the country name for the code, translated to the given (currently active) language."""
+    return countries.name(code)
+
+
+def country_name(code: str) -> str:
+    """Return the name of a country in the active language.
+
+    Country names are immutable per language, so lookups are memoized by code and language.
+    """
+    return _translated_country_name(code, get_language())
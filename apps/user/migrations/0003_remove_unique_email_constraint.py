@@ -0,0 +1,24 @@
+# Generated by Django 6.0.1 on 2026-10-15 06:10
+
+import django.db.models.functions.text
+from django.db import migrations
+
+
+def lowercase_emails(apps, schema_editor):
+    User = apps.get_model('user', 'User')
+    User.objects.update(email=django.db.models.functions.text.Lower('email'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0002_remove_user_email_db_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(lowercase_emails, migrations.RunPython.noop),
+        migrations.RemoveConstraint(
+            model_name='user',
+            name='unique_email_constraint',
+        ),
+    ]
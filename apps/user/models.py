@@ -4,31 +4,114 @@ This module contains the custom User model with email-based authentication
 and the Address model for managing user billing and shipping addresses.
 """
 
+import hashlib
+from collections.abc import Iterable, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
 from typing import TYPE_CHECKING, Any
 
 from django.conf import settings
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import AbstractUser, BaseUserManager
-from django.db import models
-from django.db.models import Q, UniqueConstraint
-from django.db.models.functions import Lower
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import models, transaction
+from django.db.models import Prefetch, Q, UniqueConstraint
 from django.utils.translation import gettext_lazy as _
 from django_countries.fields import CountryField
 from phonenumber_field.modelfields import PhoneNumberField
 
+from .helpers import country_name
+
 if TYPE_CHECKING:
     from .models import User
 
 
+class UserQuerySet(models.QuerySet["User"]):
+    """QuerySet for users."""
+
+    def with_addresses(self) -> "UserQuerySet":
+        """Return users with their addresses prefetched, default addresses first."""
+        return self.prefetch_related(
+            Prefetch("addresses", queryset=Address.objects.order_by("-default", "address_type")),
+        )
+
+
 class CustomUserManager(BaseUserManager["User"]):
     """Manager for creating users and superusers."""
 
+    # Seconds a user looked up by natural key is kept in cache
+    natural_key_cache_timeout = 600
+
+    # Cache backends holding entries per process, where evicting on save cannot reach the other workers
+    process_local_cache_backends: tuple[type, ...] = (LocMemCache, DummyCache)
+
+    @property
+    def natural_key_cache_enabled(self) -> bool:
+        """Whether natural key lookups are cached, only when the cache is shared between workers."""
+        return not isinstance(caches[DEFAULT_CACHE_ALIAS], self.process_local_cache_backends)
+
+    def natural_key_cache_key(self, email: str) -> str:
+        """Return the cache key for the user with the given email address in the manager's database.
+
+        The email is hashed, so raw login input never reaches the cache backend as part of a key.
+        """
+        email_hash = hashlib.sha256(email.encode()).hexdigest()
+
+        return f"user:nk:{self.db}:{email_hash}"
+
+    def get_by_natural_key(self, email: str) -> "User":
+        """Retrieve a user by email address, using the cache to avoid a query on repeated authentications.
+
+        The cache is only used with a backend shared between workers (e.g. Redis or Memcached), since the cached user
+        is trusted for its password and active status. With a process-local backend such as the default
+        ``LocMemCache`` every lookup queries the database.
+
+        Cached users are evicted when a user is saved or deleted through the model. Bulk writes such as
+        ``QuerySet.update()`` send no signals, so callers changing users that way (e.g. deactivating them) must evict
+        the affected keys with ``natural_key_cache_key`` themselves, or the stale user keeps authenticating until the
+        entry expires.
+
+        Args:
+            email: Email address of the user.
+
+        Raises:
+            User.DoesNotExist: If no user has the given email address.
+
+        Returns:
+            User: The user instance.
+        """
+        cache_enabled = self.natural_key_cache_enabled
+        cache_key = self.natural_key_cache_key(email)
+        user = cache.get(cache_key) if cache_enabled else None
+
+        if user is None:
+            # Only load what authentication and the user's string representation need, skipping the phone number
+            user = self.only(
+                "id",
+                "email",
+                "first_name",
+                "last_name",
+                "password",
+                "is_active",
+                "is_staff",
+                "is_superuser",
+                "last_login",
+            ).get(**{self.model.USERNAME_FIELD: email})
+            if cache_enabled:
+                cache.set(cache_key, user, self.natural_key_cache_timeout)
+
+        return user
+
     def _create_user(self, email: str, password: str | None = None, **extra_fields: Any) -> "User":
         """Create a new user.
 
         Args:
             email: Email address for the user.
             password: Password for the user. If None, an unusable password is set.
-            **extra_fields: Additional fields for the user model.
+            **extra_fields: Additional fields for the user model. A ``password_hash`` already produced by
+                ``make_password`` can be given instead of ``password`` to skip hashing on trusted import paths.
 
         Raises:
             ValueError: If email is missing.
@@ -39,12 +122,15 @@ class CustomUserManager(BaseUserManager["User"]):
         if not email:
             raise ValueError(_("The Email field cannot be empty"))
 
-        email = self.normalize_email(email).lower()
+        password_hash = extra_fields.pop("password_hash", None)
 
+        # The email is lowercased by User.save(), which also covers normalize_email() lowercasing the domain
         user = self.model(email=email, **extra_fields)
 
         # Set an unusable password if none provided
-        if password:
+        if password_hash:
+            user.password = password_hash
+        elif password:
             user.set_password(password)
         else:
             user.set_unusable_password()
@@ -69,6 +155,49 @@ class CustomUserManager(BaseUserManager["User"]):
 
         return self._create_user(email, password, **extra_fields)
 
+    def bulk_create_users(self, users_data: Iterable[Mapping[str, Any]], batch_size: int = 1000) -> list["User"]:
+        """Create many regular users at once.
+
+        Passwords are hashed concurrently and users are inserted in batches, instead of one hash and one query per
+        user as in ``create_user``. Model ``save`` and its signals are not run for the created users.
+
+        Args:
+            users_data: Mappings with the ``email``, an optional ``password`` (or ``password_hash`` already produced by
+                ``make_password``, which skips hashing) and any additional user fields.
+            batch_size: Number of users inserted per query.
+
+        Raises:
+            ValueError: If an email is missing.
+
+        Returns:
+            list[User]: The created user instances.
+        """
+        users_data = [dict(data) for data in users_data]
+
+        if not all(data.get("email") for data in users_data):
+            raise ValueError(_("The Email field cannot be empty"))
+
+        def hash_password(password: str | None, password_hash: str | None) -> str:
+            """Return the given hash, or hash the password (missing passwords hash as unusable)."""
+            return password_hash or make_password(password)
+
+        passwords = [data.pop("password", None) or None for data in users_data]
+        given_hashes = [data.pop("password_hash", None) for data in users_data]
+
+        # Hashing releases the GIL, so threads spread it across cores
+        with ThreadPoolExecutor() as executor:
+            password_hashes = list(executor.map(hash_password, passwords, given_hashes))
+
+        users = []
+        for data, password_hash in zip(users_data, password_hashes, strict=True):
+            data.setdefault("is_staff", False)
+            data.setdefault("is_superuser", False)
+            email = data.pop("email").lower()
+
+            users.append(self.model(email=email, password=password_hash, **data))
+
+        return self.bulk_create(users, batch_size=batch_size)
+
     def create_superuser(self, email: str, password: str | None = None, **extra_fields: Any) -> "User":
         """Create a superuser.
 
@@ -99,7 +228,7 @@ class User(AbstractUser):
 
     username = None  # Delete the username field, use email instead
 
-    email = models.EmailField(_("email address"), unique=True, db_index=True)
+    email = models.EmailField(_("email address"), unique=True)
     phone = PhoneNumberField(_("phone number"), null=True, blank=True)
     is_active = models.BooleanField(
         _("active"),
@@ -110,13 +239,12 @@ class User(AbstractUser):
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = []
 
-    objects = CustomUserManager()
+    objects = CustomUserManager.from_queryset(UserQuerySet)()
 
     class Meta:
         """Metadata configuration for the User model."""
 
         constraints = [
-            UniqueConstraint(Lower("email"), name="unique_email_constraint"),
             UniqueConstraint("phone", name="unique_phone_constraint", condition=Q(phone__isnull=False)),
         ]
 
@@ -126,6 +254,14 @@ class User(AbstractUser):
         Returns:
             str: User's full name with email, or just email if full name is empty.
         """
+        return self.display_name
+
+    @cached_property
+    def display_name(self) -> str:
+        """User's full name with email, or just email if full name is empty.
+
+        Computed once per instance and reset when the user is saved or refreshed from the database.
+        """
         full_name = self.get_full_name().strip()
 
         if full_name:
@@ -133,6 +269,61 @@ class User(AbstractUser):
 
         return self.email
 
+    @classmethod
+    def from_db(cls, db: str | None, field_names: Any, values: Any) -> "User":
+        """Create an instance from database values, keeping track of its loaded email address."""
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_email = instance.__dict__.get("email")
+
+        return instance
+
+    def clean(self) -> None:
+        """Validate the user instance.
+
+        The email address is only normalized when it has changed since the user was loaded.
+        """
+        if self.email and self.email != getattr(self, "_loaded_email", None):
+            super().clean()
+            self.email = self.email.lower()
+
+    def save(self, *args: Any, **kwargs: Any) -> None:
+        """Save the user instance.
+
+        The email address is stored lowercased, so the unique index on it is enough to keep it case-insensitive.
+
+        Args:
+            *args: Variable length argument list.
+            **kwargs: Arbitrary keyword arguments.
+        """
+        email = self.__dict__.get("email")
+
+        if email and email != getattr(self, "_loaded_email", None):
+            self.email = email.lower()
+
+        super().save(*args, **kwargs)
+
+        self._loaded_email = self.__dict__.get("email")
+        self.__dict__.pop("display_name", None)
+
+    def refresh_from_db(self, *args: Any, **kwargs: Any) -> None:
+        """Reload field values from the database, resetting the cached display name.
+
+        Args:
+            *args: Variable length argument list.
+            **kwargs: Arbitrary keyword arguments.
+        """
+        super().refresh_from_db(*args, **kwargs)
+
+        self.__dict__.pop("display_name", None)
+
+
+class AddressQuerySet(models.QuerySet["Address"]):
+    """QuerySet for addresses."""
+
+    def for_display(self) -> "AddressQuerySet":
+        """Return addresses loading only the fields used by their string representation."""
+        return self.only("street", "city", "country")
+
 
 class Address(models.Model):
     """Model representing a user's address."""
@@ -167,6 +358,8 @@ class Address(models.Model):
     created_at = models.DateTimeField(_("created at"), auto_now_add=True)
     updated_at = models.DateTimeField(_("updated at"), auto_now=True)
 
+    objects = AddressQuerySet.as_manager()
+
     class Meta:
         """Metadata configuration for the Address model."""
 
@@ -188,22 +381,59 @@ class Address(models.Model):
         Returns:
             str: Address string with street, city, and country.
         """
-        return f"{self.street}, {self.city}, {self.country.name}"
+        return f"{self.street}, {self.city}, {country_name(self.country.code)}"
 
-    def save(self, *args: Any, **kwargs: Any) -> None:
+    @classmethod
+    def from_db(cls, db: str | None, field_names: Any, values: Any) -> "Address":
+        """Create an instance from database values, keeping track of its loaded default slot."""
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_default_slot = instance._default_slot
+
+        return instance
+
+    @property
+    def _default_slot(self) -> tuple[int | None, str] | None:
+        """Return the (user, address type) pair this address is the default for, if any."""
+        if not self.__dict__.get("default"):
+            return None
+
+        return self.user_id, self.address_type
+
+    def save(self, *args: Any, update_fields: Iterable[str] | None = None, **kwargs: Any) -> None:
         """Save the address instance.
 
-        If this address is marked as default, unset default on other addresses of the same type for this user.
+        If this address becomes the default, unset default on other addresses of the same type for this user.
+        The extra update is skipped when the address was already stored as the default for the same user and type,
+        and for partial saves that leave the default slot untouched.
 
         Args:
             *args: Variable length argument list.
+            update_fields: Names of the fields to save, all fields are saved if None.
             **kwargs: Arbitrary keyword arguments.
         """
-        if self.default:
-            Address.objects.filter(
-                user=self.user,
-                address_type=self.address_type,
-                default=True,
-            ).update(default=False)
+        if update_fields is not None and {"user", "user_id", "address_type", "default"}.isdisjoint(update_fields):
+            super().save(*args, update_fields=update_fields, **kwargs)
+            return
 
-        super().save(*args, **kwargs)
+        default_slot = self._default_slot
+
+        if default_slot is None or default_slot == getattr(self, "_loaded_default_slot", None):
+            super().save(*args, update_fields=update_fields, **kwargs)
+        else:
+            with transaction.atomic():
+                self._unset_other_defaults()
+                super().save(*args, update_fields=update_fields, **kwargs)
+
+        self._loaded_default_slot = default_slot
+
+    def _unset_other_defaults(self) -> int:
+        """Unset default on other addresses of the same type for this user.
+
+        Returns:
+            int: Number of addresses updated.
+        """
+        return (
+            Address.objects.filter(user_id=self.user_id, address_type=self.address_type, default=True)
+            .exclude(pk=self.pk)
+            .update(default=False)
+        )
@@ -1,5 +1,23 @@
 """Signals for user-related events."""
 
-from django.dispatch import Signal
+from typing import Any
+
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from .models import User
 
 user_registered = Signal()
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_user_natural_key_cache(sender: type[User], instance: User, **kwargs: Any) -> None:
+    """Remove the cached natural key lookup of a saved or deleted user."""
+    # Login only refreshes last_login, keep the cached user to serve the next authentication
+    if kwargs.get("update_fields") == frozenset({"last_login"}):
+        return
+
+    manager = User.objects.db_manager(kwargs.get("using"))
+    emails = {instance.__dict__.get("email"), getattr(instance, "_loaded_email", None)} - {None}
+    cache.delete_many([manager.natural_key_cache_key(email) for email in emails])
@@ -0,0 +1,320 @@
+"""Tests for the user app."""
+
+from unittest import mock
+
+from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import translation
+
+from .helpers import country_name
+from .models import Address, CustomUserManager, User
+
+
+class AddressDefaultTests(TestCase):
+    """Tests for keeping a single default address per user and address type."""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        """Create the user owning the addresses."""
+        cls.user = User.objects.create_user("user@example.com")
+
+    def create_address(self, **kwargs: object) -> Address:
+        """Create an address for the test user."""
+        return Address.objects.create(
+            user=self.user,
+            country="US",
+            first_name="Jane",
+            last_name="Doe",
+            phone="+12025550123",
+            street="1 Main St",
+            city="Springfield",
+            **kwargs,
+        )
+
+    def default_ids(self) -> list[int]:
+        """Return the ids of the test user's default addresses."""
+        return list(Address.objects.filter(user=self.user, default=True).values_list("id", flat=True))
+
+    def test_new_default_unsets_previous_default(self) -> None:
+        """Test that creating a default address unsets the previous default of the same type."""
+        first = self.create_address(default=True)
+        second = self.create_address(default=True)
+
+        self.assertEqual(self.default_ids(), [second.pk])
+        first.refresh_from_db()
+        self.assertFalse(first.default)
+
+    def test_existing_address_becoming_default_unsets_previous_default(self) -> None:
+        """Test that flipping a loaded address to default unsets the previous default."""
+        address = self.create_address()
+        default = self.create_address(default=True)
+
+        address = Address.objects.get(pk=address.pk)
+        address.default = True
+        address.save()
+
+        self.assertEqual(self.default_ids(), [address.pk])
+        self.assertNotIn(default.pk, self.default_ids())
+
+    def test_default_of_other_type_is_kept(self) -> None:
+        """Test that defaults of another address type are left untouched."""
+        billing = self.create_address(default=True, address_type=Address.AddressType.BILLING)
+        shipping = self.create_address(default=True, address_type=Address.AddressType.SHIPPING)
+
+        self.assertCountEqual(self.default_ids(), [billing.pk, shipping.pk])
+
+    def test_resaving_loaded_default_skips_unset_query(self) -> None:
+        """Test that saving an address already stored as default only updates itself."""
+        address = Address.objects.get(pk=self.create_address(default=True).pk)
+        address.city = "Shelbyville"
+
+        with self.assertNumQueries(1):
+            address.save()
+
+    def test_partial_save_without_default_fields_skips_unset_query(self) -> None:
+        """Test that a partial save not touching the default slot only updates itself."""
+        address = self.create_address(default=True)
+        address.street = "2 Main St"
+
+        with self.assertNumQueries(1):
+            address.save(update_fields=["street"])
+
+
+class UserNaturalKeyCacheTests(TestCase):
+    """Tests for the natural key cache of users and its invalidation."""
+
+    def setUp(self) -> None:
+        """Create a user and cache its natural key lookup, treating the test cache as shared between workers."""
+        patcher = mock.patch.object(CustomUserManager, "process_local_cache_backends", ())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        cache.clear()
+        self.user = User.objects.create_user("user@example.com", is_active=True)
+        User.objects.get_by_natural_key("user@example.com")
+
+    def is_cached(self, email: str) -> bool:
+        """Return whether a natural key lookup is cached for the email."""
+        return User.objects.natural_key_cache_key(email) in cache
+
+    def test_lookup_is_served_from_cache(self) -> None:
+        """Test that a repeated natural key lookup runs no query."""
+        with self.assertNumQueries(0):
+            user = User.objects.get_by_natural_key("user@example.com")
+
+        self.assertEqual(user.pk, self.user.pk)
+
+    def test_cached_user_renders_without_queries(self) -> None:
+        """Test that the looked up user loads the fields used by its string representation."""
+        user = User.objects.get_by_natural_key("user@example.com")
+
+        with self.assertNumQueries(0):
+            str(user)
+
+        self.assertEqual(user.get_deferred_fields(), {"phone", "date_joined"})
+
+    def test_cache_key_hashes_email(self) -> None:
+        """Test that the cache key does not contain the raw email, which may be invalid in a key."""
+        email = f" {'a' * 300}@example.com"
+
+        self.assertNotIn(email, User.objects.natural_key_cache_key(email))
+        self.assertLess(len(User.objects.natural_key_cache_key(email)), 250)
+
+    def test_cache_key_depends_on_database(self) -> None:
+        """Test that lookups on different databases do not share cache entries."""
+        self.assertNotEqual(
+            User.objects.db_manager("default").natural_key_cache_key("user@example.com"),
+            User.objects.db_manager("other").natural_key_cache_key("user@example.com"),
+        )
+
+    def test_save_evicts_cached_user(self) -> None:
+        """Test that saving the user evicts its cached lookup."""
+        self.user.is_active = False
+        self.user.save()
+
+        self.assertFalse(self.is_cached("user@example.com"))
+        self.assertFalse(User.objects.get_by_natural_key("user@example.com").is_active)
+
+    def test_email_change_evicts_old_and_new_keys(self) -> None:
+        """Test that changing the email evicts the cached lookups of both addresses."""
+        cache.set(User.objects.natural_key_cache_key("new@example.com"), self.user)
+
+        self.user.email = "new@example.com"
+        self.user.save()
+
+        self.assertFalse(self.is_cached("user@example.com"))
+        self.assertFalse(self.is_cached("new@example.com"))
+
+    def test_delete_evicts_cached_user(self) -> None:
+        """Test that deleting the user evicts its cached lookup."""
+        self.user.delete()
+
+        self.assertFalse(self.is_cached("user@example.com"))
+        with self.assertRaises(User.DoesNotExist):
+            User.objects.get_by_natural_key("user@example.com")
+
+    def test_last_login_only_save_keeps_cached_user(self) -> None:
+        """Test that a save only refreshing last_login keeps the cached lookup."""
+        self.user.save(update_fields=["last_login"])
+
+        self.assertTrue(self.is_cached("user@example.com"))
+
+
+class ProcessLocalNaturalKeyCacheTests(TestCase):
+    """Tests for natural key lookups with a cache local to each worker process."""
+
+    def setUp(self) -> None:
+        """Create a user and leave a stale copy of it in the cache, as another worker's cache would hold."""
+        cache.clear()
+        self.user = User.objects.create_user("user@example.com", "old-password", is_active=True)
+        cache.set(User.objects.natural_key_cache_key("user@example.com"), User.objects.get(pk=self.user.pk))
+
+    def test_lookup_queries_database(self) -> None:
+        """Test that the lookup ignores the stale cache entry."""
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+
+        with self.assertNumQueries(1):
+            self.assertFalse(User.objects.get_by_natural_key("user@example.com").is_active)
+
+    def test_old_password_rejected_after_change(self) -> None:
+        """Test that a password changed in the database invalidates the old one despite the stale entry."""
+        User.objects.filter(pk=self.user.pk).update(password=make_password("new-password"))
+
+        self.assertIsNone(authenticate(email="user@example.com", password="old-password"))
+        self.assertEqual(authenticate(email="user@example.com", password="new-password"), self.user)
+
+
+class BulkCreateUsersTests(TestCase):
+    """Tests for creating users in bulk."""
+
+    def test_creates_users_with_lowercased_emails_and_hashed_passwords(self) -> None:
+        """Test that users are created with normalized emails, hashed or unusable passwords."""
+        User.objects.bulk_create_users(
+            [{"email": "One@Example.com", "password": "secret"}, {"email": "two@example.com"}],
+        )
+
+        self.assertTrue(User.objects.get(email="one@example.com").check_password("secret"))
+        self.assertFalse(User.objects.get(email="two@example.com").has_usable_password())
+
+    def test_uses_given_password_hash(self) -> None:
+        """Test that a pre-computed password hash is stored as is."""
+        password_hash = make_password("secret")
+
+        User.objects.bulk_create_users([{"email": "user@example.com", "password_hash": password_hash}])
+
+        self.assertEqual(User.objects.get(email="user@example.com").password, password_hash)
+
+    def test_missing_email_raises(self) -> None:
+        """Test that a mapping without email is rejected before anything is created."""
+        with self.assertRaises(ValueError):
+            User.objects.bulk_create_users([{"email": "user@example.com"}, {"password": "secret"}])
+
+        self.assertFalse(User.objects.exists())
+
+
+class UserQuerySetTests(TestCase):
+    """Tests for the user queryset."""
+
+    def test_with_addresses_prefetches_addresses_default_first(self) -> None:
+        """Test that addresses are prefetched in a single query, default addresses first."""
+        user = User.objects.create_user("user@example.com")
+        fields = {"country": "US", "first_name": "Jane", "last_name": "Doe", "phone": "+12025550123", "city": "Town"}
+        Address.objects.create(user=user, street="1 Main St", **fields)
+        default = Address.objects.create(user=user, street="2 Main St", default=True, **fields)
+
+        with self.assertNumQueries(2):
+            addresses = [list(user.addresses.all()) for user in User.objects.with_addresses()]
+
+        self.assertEqual(addresses[0][0], default)
+
+    def test_manager_keeps_router_hints(self) -> None:
+        """Test that querysets built by the manager keep the hints given to it."""
+        hints = {"instance": User(email="user@example.com")}
+
+        self.assertEqual(User.objects.db_manager(hints=hints).get_queryset()._hints, hints)
+
+
+class UserEmailNormalizationTests(TestCase):
+    """Tests for storing user emails lowercased."""
+
+    def test_create_user_lowercases_email(self) -> None:
+        """Test that created users have their whole email address lowercased."""
+        self.assertEqual(User.objects.create_user("User@Example.COM").email, "user@example.com")
+
+    def test_clean_lowercases_changed_email(self) -> None:
+        """Test that cleaning a user lowercases a changed email address."""
+        user = User.objects.create_user("user@example.com")
+        user.email = "New@Example.COM"
+
+        user.clean()
+
+        self.assertEqual(user.email, "new@example.com")
+
+
+class UserDisplayNameTests(TestCase):
+    """Tests for the cached display name of users."""
+
+    def setUp(self) -> None:
+        """Create a user and cache its display name."""
+        self.user = User.objects.create_user("user@example.com", first_name="Ann")
+        self.assertEqual(str(self.user), "Ann (user@example.com)")
+
+    def test_display_name_without_full_name(self) -> None:
+        """Test that the display name falls back to the email address."""
+        self.assertEqual(str(User(email="other@example.com")), "other@example.com")
+
+    def test_save_resets_display_name(self) -> None:
+        """Test that saving the user recomputes its display name."""
+        self.user.first_name = "Zed"
+        self.user.save()
+
+        self.assertEqual(str(self.user), "Zed (user@example.com)")
+
+    def test_refresh_from_db_resets_display_name(self) -> None:
+        """Test that refreshing the user from the database recomputes its display name."""
+        User.objects.filter(pk=self.user.pk).update(first_name="Zed")
+
+        self.user.refresh_from_db()
+
+        self.assertEqual(str(self.user), "Zed (user@example.com)")
+
+
+class AddressDisplayTests(TestCase):
+    """Tests for rendering addresses."""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        """Create an address to render."""
+        cls.address = Address.objects.create(
+            user=User.objects.create_user("user@example.com"),
+            country="DE",
+            first_name="Jane",
+            last_name="Doe",
+            phone="+12025550123",
+            street="1 Main St",
+            city="Berlin",
+        )
+
+    def test_str(self) -> None:
+        """Test that the address renders its street, city and country name, as with Country.name."""
+        self.assertEqual(str(self.address), "1 Main St, Berlin, Germany")
+        self.assertEqual(str(self.address), f"1 Main St, Berlin, {self.address.country.name}")
+
+    def test_for_display_renders_in_single_query(self) -> None:
+        """Test that addresses loaded for display render without loading deferred fields."""
+        with self.assertNumQueries(1):
+            rendered = [str(address) for address in Address.objects.for_display()]
+
+        self.assertEqual(rendered, ["1 Main St, Berlin, Germany"])
+
+    def test_country_name_follows_active_language(self) -> None:
+        """Test that memoized country names are returned in the active language."""
+        self.assertEqual(country_name("DE"), "Germany")
+
+        with translation.override("fr"):
+            self.assertEqual(country_name("DE"), "Allemagne")
+            self.assertEqual(str(self.address), "1 Main St, Berlin, Allemagne")
+
+        self.assertEqual(country_name("DE"), "Germany")